@@ -1,7 +1,7 @@
 """
 MCP Server
 
-This Flask-based HTTP server acts as an intermediary between web browsers
+This FastAPI-based HTTP server acts as an intermediary between web browsers
 and Model Context Protocol (MCP) tools. It provides a REST API interface that
 translates HTTP requests into MCP protocol calls.
 
@@ -11,7 +11,8 @@ Architecture:
     The MCP server:
     1. Receives HTTP POST requests with JSON payloads
     2. Translates them into MCP protocol format
-    3. Executes MCP tools as subprocesses via stdin/stdout
+    3. Calls the MCP tools, either imported in-process or as pooled
+       subprocesses spoken to over Unix domain sockets (see TOOL_MODE)
     4. Parses MCP tool responses and returns them as HTTP JSON responses
     5. Handles CORS to allow browser access from different origins
 
@@ -27,10 +28,12 @@ Usage in MCP_Docker-Demo:
     Frontend (mcp_host.html) → MCP Server (this file) → MCP Tools (weather/time tools)
 
 Docker Integration:
-    - Runs on port 5000 inside the mcp-server container
+    - Runs under uvicorn on port 5000 inside the mcp-server container
     - Exposed to host machine via docker-compose port mapping
     - Contains weather-tool and time-tool Python scripts
-    - Executes MCP tools as subprocesses within the same container
+    - Imports the MCP tools in-process by default (TOOL_MODE=inproc)
+    - TOOL_MODE=subprocess executes them as long-lived subprocesses instead
+    - MCP_POOL_SIZE sets how many processes are kept per tool
 
 Protocol Translation:
     HTTP Request:  {"location": "Seattle"}
@@ -43,17 +46,183 @@ Reference:
     https://modelcontextprotocol.io/
 """
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import subprocess
-import json
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+import asyncio
+import importlib.util
+import inspect
+import logging
+import msgspec
+import orjson
+import os
+import socket
+import uvicorn
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for browser access from different origins
+# Per-request logging is at DEBUG level; set LOG_LEVEL=DEBUG to see it
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "WARNING"))
+log = logging.getLogger(__name__)
 
-def call_mcp_tool(tool_path, tool_name, input_data):
+# MCP tool scripts, as copied into the container by the Dockerfile
+WEATHER_TOOL = "/app/weather-tool/tool.py"
+TIME_TOOL = "/app/time-tool/tool.py"
+
+# Seconds to wait for an MCP tool to answer a call
+TOOL_TIMEOUT = 10
+
+# How tools are run: "inproc" imports them and calls them directly,
+# "subprocess" talks MCP to pooled tool processes over Unix domain sockets
+TOOL_MODE = os.environ.get("TOOL_MODE", "inproc")
+
+# Encoding of the frames sent to pooled tool processes: MessagePack, or JSON
+# with MCP_WIRE=json for debugging. Tools inherit it from this environment.
+MCP_WIRE = os.environ.get("MCP_WIRE", "msgpack")
+
+# Number of long-lived processes kept per MCP tool (override with MCP_POOL_SIZE)
+POOL_SIZE = int(os.environ.get("MCP_POOL_SIZE", min(4, os.cpu_count() or 1)))
+
+class ToolProcess:
+    """
+    A long-lived MCP tool subprocess that serves one call at a time.
+
+    The tool is started once and kept running, so each HTTP request only pays
+    for a message round trip instead of a fresh Python interpreter. It talks
+    MCP over one end of a Unix domain socket pair, with each message framed
+    as a 4-byte little-endian length plus its MCP_WIRE payload. All I/O runs
+    on the server's event loop, so waiting on a tool ties up no thread.
+    Reads time out after TOOL_TIMEOUT. If the process dies or misbehaves it
+    is respawned on the next call.
+    """
+
+    def __init__(self, tool_path):
+        self.tool_path = tool_path
+        self.proc = None
+        self.reader = None
+        self.writer = None
+
+    async def start(self):
+        """
+        Start the tool process unless it is already running.
+        """
+        if self.proc is None or self.proc.returncode is not None:
+            await self._spawn()
+
+    async def _spawn(self):
+        self._kill()
+        sock, child_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            with child_sock:
+                self.proc = await asyncio.create_subprocess_exec(
+                    "python", self.tool_path, "--socket-fd", str(child_sock.fileno()),
+                    pass_fds=(child_sock.fileno(),)
+                )
+            self.reader, self.writer = await asyncio.open_unix_connection(sock=sock)
+        except BaseException:
+            # Our end of the pair isn't owned by a stream yet, so don't leak it
+            sock.close()
+            raise
+        # The first message from an MCP tool is always its tool description
+        await asyncio.wait_for(self._recv_message(), TOOL_TIMEOUT)
+
+    def _kill(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if self.proc is not None and self.proc.returncode is None:
+            self.proc.kill()
+        self.proc = None
+
+    async def stop(self):
+        """
+        Kill the tool process and wait for it to exit.
+        """
+        proc = self.proc
+        self._kill()
+        if proc is not None:
+            await proc.wait()
+
+    async def _send_message(self, message):
+        data = orjson.dumps(message) if MCP_WIRE == "json" else msgspec.msgpack.encode(message)
+        self.writer.write(len(data).to_bytes(4, "little") + data)
+        await self.writer.drain()
+
+    async def _recv_message(self):
+        size = int.from_bytes(await self.reader.readexactly(4), "little")
+        data = await self.reader.readexactly(size)
+        return orjson.loads(data) if MCP_WIRE == "json" else msgspec.msgpack.decode(data)
+
+    async def call(self, mcp_request):
+        """
+        Send one MCP message to the tool and wait for its reply.
+        Callers must have checked the process out of its ToolPool.
+
+        Returns:
+            dict: The tool's output data or error information
+        """
+        try:
+            await self.start()
+            await self._send_message(mcp_request)
+            # The tool answers each call with exactly one message
+            data = await asyncio.wait_for(self._recv_message(), TOOL_TIMEOUT)
+            if data.get("type") == "tool-result":
+                return data["output"]
+            if data.get("type") == "error":
+                return {"error": data["error"]}
+            raise RuntimeError(f"Unexpected MCP message type: {data.get('type')}")
+        except BaseException:
+            # A late reply would be read by the next caller (this includes a
+            # request cancelled mid-call), so start over
+            self._kill()
+            raise
+
+class ToolPool:
     """
-    Execute an MCP tool as a subprocess and parse its response.
+    A fixed set of ToolProcess workers for one MCP tool.
+
+    Idle workers wait in a queue; each call checks one out and returns it
+    when done, so a request goes to whichever process is free rather than
+    queueing behind a busy one.
+    """
+
+    def __init__(self, tool_path, size=POOL_SIZE):
+        self.workers = [ToolProcess(tool_path) for _ in range(size)]
+        self.idle = asyncio.Queue()
+        for worker in self.workers:
+            self.idle.put_nowait(worker)
+
+    async def start(self):
+        """
+        Start every worker process up front so no request pays for it.
+        """
+        await asyncio.gather(*(worker.start() for worker in self.workers))
+
+    async def stop(self):
+        """
+        Shut down every worker process.
+        """
+        await asyncio.gather(*(worker.stop() for worker in self.workers))
+
+    async def call(self, mcp_request):
+        worker = await asyncio.wait_for(self.idle.get(), TOOL_TIMEOUT)
+        try:
+            return await worker.call(mcp_request)
+        finally:
+            self.idle.put_nowait(worker)
+
+_pools = {}
+
+def get_pool(tool_path):
+    """
+    Return the process pool for a tool, creating it on first use.
+    """
+    if tool_path not in _pools:
+        _pools[tool_path] = ToolPool(tool_path)
+    return _pools[tool_path]
+
+async def call_mcp_tool(tool_path, tool_name, input_data):
+    """
+    Send a tool call to a pooled MCP tool process and parse its response.
     
     Args:
         tool_path (str): Path to the MCP tool Python script
@@ -63,9 +232,9 @@ def call_mcp_tool(tool_path, tool_name, input_data):
     Returns:
         dict: The tool's output data or error information
         
-    Protocol:
-        Sends JSON to tool's stdin: {"type": "tool-call", "tool": "tool-name", "input": {...}}
-        Receives JSON from stdout: {"type": "tool-result", "output": {...}}
+    Protocol (length-prefixed MessagePack frames over the tool's Unix socket):
+        Sends to the tool: {"type": "tool-call", "tool": "tool-name", "input": {...}}
+        Receives back: {"type": "tool-result", "output": {...}}
     """
     try:
         # Prepare MCP protocol message
@@ -74,73 +243,158 @@ def call_mcp_tool(tool_path, tool_name, input_data):
             "tool": tool_name,
             "input": input_data
         }
-          # Execute the MCP tool as a subprocess
-        result = subprocess.run(
-            ["python", tool_path],
-            input=json.dumps(mcp_request),
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        if result.returncode == 0:
-            # Parse the JSON output from the MCP tool
-            lines = result.stdout.strip().split('\n')
-            for line in lines:
-                try:
-                    data = json.loads(line)
-                    if data.get("type") == "tool-result":
-                        return data["output"]
-                except:
-                    continue
-            return {"error": "No valid tool result found"}
+        # Hand the message to an already running MCP tool process
+        return await get_pool(tool_path).call(mcp_request)
+    except TimeoutError:
+        # Surfaced as 504 Gateway Timeout by tool_timeout() below
+        raise
+    except Exception as e:
+        return {"error": str(e)}
+
+_modules = {}
+
+def get_tool_module(tool_path):
+    """
+    Import an MCP tool script as a module, loading it on first use.
+    The tool directories (e.g. weather-tool) aren't valid package names,
+    so the script is loaded from its file path.
+    """
+    if tool_path not in _modules:
+        name = os.path.basename(os.path.dirname(tool_path)).replace("-", "_")
+        spec = importlib.util.spec_from_file_location(name, tool_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[tool_path] = module
+    return _modules[tool_path]
+
+async def call_inproc_tool(tool_path, tool_name, input_data):
+    """
+    Call an MCP tool's handle_call() directly, skipping the MCP message framing.
+    
+    Args:
+        tool_path (str): Path to the MCP tool Python script
+        tool_name (str): Name of the MCP tool to call (e.g., "get-forecast")
+        input_data (dict): Input parameters for the tool
+    
+    Returns:
+        dict: The tool's output data or error information
+    """
+    handle_call = get_tool_module(tool_path).handle_call
+    try:
+        if inspect.iscoroutinefunction(handle_call):
+            # Async tools share the server's event loop
+            call = handle_call(tool_name, input_data)
         else:
-            return {"error": f"Tool execution failed: {result.stderr}"}
-            
+            # Blocking tools run on a worker thread so other requests keep going
+            call = asyncio.to_thread(handle_call, tool_name, input_data)
+        return await asyncio.wait_for(call, TOOL_TIMEOUT)
+    except TimeoutError:
+        # Surfaced as 504 Gateway Timeout by tool_timeout() below
+        raise
     except Exception as e:
         return {"error": str(e)}
 
-@app.route("/weather", methods=["POST"])
-def weather():
+async def call_tool(tool_path, tool_name, input_data):
+    """
+    Call an MCP tool in whichever way TOOL_MODE selects.
+    """
+    if TOOL_MODE == "subprocess":
+        return await call_mcp_tool(tool_path, tool_name, input_data)
+    return await call_inproc_tool(tool_path, tool_name, input_data)
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Load the tools at startup rather than on the first request: import them
+    for in-process calls, or start their process pools (stopped on shutdown).
+    """
+    for tool_path in (WEATHER_TOOL, TIME_TOOL):
+        if TOOL_MODE == "subprocess":
+            await get_pool(tool_path).start()
+        else:
+            get_tool_module(tool_path)
+    yield
+    for pool in _pools.values():
+        await pool.stop()
+
+app = FastAPI(lifespan=lifespan)
+# Enable CORS for browser access from different origins
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+
+def json_response(data, status=200):
+    """
+    Serialize a response body straight to JSON bytes with orjson.
+    Skips FastAPI's jsonable_encoder and stdlib json on the way out.
+    """
+    return Response(orjson.dumps(data), status_code=status, media_type="application/json")
+
+class LocationRequest(msgspec.Struct):
+    """
+    Request body for /weather and /time: {"location": "city name"}
+    """
+    location: str = ""
+
+async def read_request(request):
+    """
+    Decode and type-check a request body in one pass with msgspec.
+    Invalid JSON or a wrong field type raises msgspec.DecodeError.
+    """
+    return msgspec.json.decode(await request.body(), type=LocationRequest)
+
+@app.exception_handler(msgspec.DecodeError)
+async def invalid_request(request, error):
+    """
+    Report a body that isn't a valid LocationRequest as a bad request.
+    """
+    return json_response({"error": f"Invalid request: {error}"}, 400)
+
+@app.exception_handler(TimeoutError)
+async def tool_timeout(request, error):
+    """
+    Report a tool that did not answer within TOOL_TIMEOUT as a gateway timeout.
+    """
+    return json_response({"error": f"Tool did not respond within {TOOL_TIMEOUT} seconds"}, 504)
+
+@app.post("/weather")
+async def weather(request: Request):
     """
     HTTP endpoint for weather forecast requests.
     
     Expected JSON payload: {"location": "city name"}
     Returns: {"location": "city", "forecast": "weather description"}
     """
-    print(f"Weather request received: {request.get_json()}")
-    data = request.get_json()
-    location = data.get("location", "")
+    payload = await read_request(request)
+    log.debug("Weather request received: %s", payload)
+    location = payload.location
     
     if not location:
-        return jsonify({"error": "Missing location"}), 400
+        return json_response({"error": "Missing location"}, 400)
       # Call the weather MCP tool
-    result = call_mcp_tool("/app/weather-tool/tool.py", "get-forecast", {"location": location})
-    print(f"Weather result: {result}")
-    return jsonify(result)
+    result = await call_tool(WEATHER_TOOL, "get-forecast", {"location": location})
+    log.debug("Weather result: %s", result)
+    return json_response(result)
 
-@app.route("/time", methods=["POST"])  
-def time():
+@app.post("/time")
+async def time(request: Request):
     """
     HTTP endpoint for current time requests.
     
     Expected JSON payload: {"location": "city name"}
     Returns: {"location": "city", "time": "HH:MM:SS", "date": "YYYY-MM-DD", "timezone": "zone"}
     """
-    print(f"Time request received: {request.get_json()}")
-    data = request.get_json()
-    location = data.get("location", "")
+    payload = await read_request(request)
+    log.debug("Time request received: %s", payload)
+    location = payload.location
     
     if not location:
-        return jsonify({"error": "Missing location"}), 400
+        return json_response({"error": "Missing location"}, 400)
       # Call the time MCP tool
-    result = call_mcp_tool("/app/time-tool/tool.py", "get-time", {"location": location})
-    print(f"Time result: {result}")
-    return jsonify(result)
+    result = await call_tool(TIME_TOOL, "get-time", {"location": location})
+    log.debug("Time result: %s", result)
+    return json_response(result)
 
 if __name__ == "__main__":
-    # Run the Flask development server
+    # Run the ASGI server directly (the container runs uvicorn from its CMD)
     # host="0.0.0.0" allows access from outside the container
     # port=5000 matches the Docker port mapping
-    # debug=True enables hot reloading and detailed error messages
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    uvicorn.run(app, host="0.0.0.0", port=5000)
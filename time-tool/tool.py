@@ -20,7 +20,9 @@ Usage:
     
     # Typically this server is called by an MCP client rather than directly
     
-    # In this Docker demo, the bridge service calls this tool via subprocess
+    # In this Docker demo, the MCP server either imports this tool or runs it
+    # as a subprocess with --socket-fd, speaking length-prefixed MessagePack
+    # MCP frames over a Unix domain socket (MCP_WIRE=json for JSON frames)
 
 Architecture in MCP-Demo:
     Browser → Frontend Container → Bridge Container → MCP Tool (this file)
@@ -42,22 +44,61 @@ Note:
     timezone service or implementing local timezone data.
 """
 
+import io
 import sys
-import json
+import socket
+import argparse
+import orjson
+import msgspec
+import os
+import asyncio
 import datetime
-import requests
+import httpx
+from cachetools import TTLCache
+
+# Encoding of socket frames: MessagePack by default, or JSON with MCP_WIRE=json
+# for debugging. The stdio transport always uses JSON lines.
+MCP_WIRE = os.environ.get("MCP_WIRE", "msgpack")
+
+# Incoming calls are read as raw bytes straight into orjson, skipping the
+# text layer's UTF-8 decoding and newline translation
+STDIN_BUFFER_SIZE = 65536
 
 # Nominatim requires a User-Agent header
 HEADERS = {
     "User-Agent": "MCP-TimeServer/1.0"
 }
 
-def describe_tools():
+# Shared HTTP client so repeated lookups reuse pooled keep-alive connections
+# (and their TLS sessions) instead of opening a new one per request
+_CLIENT = httpx.AsyncClient(
+    http2=True,
+    timeout=5.0,
+    headers=HEADERS,
+    limits=httpx.Limits(
+        max_connections=int(os.environ.get("MCP_CLIENT_MAX_CONNECTIONS", 20)),
+        max_keepalive_connections=int(os.environ.get("MCP_CLIENT_MAX_KEEPALIVE", 10)),
+        keepalive_expiry=float(os.environ.get("MCP_CLIENT_KEEPALIVE_EXPIRY", 30))
+    )
+)
+
+# Tool calls handled at once; keeps bursts within Nominatim's rate limits.
+# Taken in handle_call() so it applies over stdio, sockets and in-process calls.
+MAX_CONCURRENT_CALLS = 10
+_CALL_LIMIT = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+
+# City coordinates don't change, so successful lookups are kept for a day
+_COORDS_CACHE = TTLCache(maxsize=10_000, ttl=86400)
+# Nominatim lookups currently in progress, so concurrent calls for the same
+# location share one request
+_COORDS_IN_FLIGHT = {}
+
+def describe_tools(write):
     """
-    Advertises tool capabilities by outputting a tool description JSON.
+    Advertises tool capabilities by writing a tool description message.
     This is the first message sent by an MCP tool upon startup.
     """
-    print(json.dumps({
+    write({
         "type": "tool-description",
         "tools": [
             {
@@ -81,21 +122,63 @@ def describe_tools():
                 }
             }
         ]
-    }), flush=True)  # flush ensures immediate output
+    })
 
-def handle_call(tool, input):
+def send(message):
+    """
+    Writes one MCP message to stdout as a single line of JSON.
+    Flushes right away so the client sees the message immediately.
+    """
+    sys.stdout.buffer.write(orjson.dumps(message) + b"\n")
+    sys.stdout.buffer.flush()
+
+def frame(message):
+    """
+    Encodes one MCP message for the socket transport: a 4-byte little-endian
+    length followed by the MCP_WIRE payload, so no newline scanning is needed.
+    """
+    data = orjson.dumps(message) if MCP_WIRE == "json" else msgspec.msgpack.encode(message)
+    return len(data).to_bytes(4, "little") + data
+
+def unframe(payload):
+    """
+    Decodes the payload of one socket frame back into an MCP message.
+    """
+    return orjson.loads(payload) if MCP_WIRE == "json" else msgspec.msgpack.decode(payload)
+
+async def handle_call(tool, input):
     """
     Routes incoming tool calls to the appropriate handler function.
     Returns an error message if an unknown tool is requested.
+    At most MAX_CONCURRENT_CALLS calls run at once.
     """
     if tool == "get-time":
-        return get_time(input["location"])
+        async with _CALL_LIMIT:
+            return await get_time(input["location"])
     return { "error": "Unknown tool" }
 
-def get_coordinates(location):
+async def get_coordinates(location):
     """
     Use OpenStreetMap Nominatim to convert a city name into (lat, lon).
     Returns None if location not found.
+    Successful lookups are served from _COORDS_CACHE for a day, and calls
+    made while a lookup for the same location is running wait on that one.
+    """
+    key = location.lower().strip()
+    cached = _COORDS_CACHE.get(key)
+    if cached:
+        return cached
+    if key not in _COORDS_IN_FLIGHT:
+        task = asyncio.create_task(lookup_coordinates(location, key))
+        _COORDS_IN_FLIGHT[key] = task
+        task.add_done_callback(lambda _: _COORDS_IN_FLIGHT.pop(key, None))
+    # Shielded so one caller timing out doesn't cancel the lookup for the others
+    return await asyncio.shield(_COORDS_IN_FLIGHT[key])
+
+async def lookup_coordinates(location, key):
+    """
+    Query Nominatim for a location and cache the result under key.
+    Returns None if location not found.
     """
     try:
         url = "https://nominatim.openstreetmap.org/search"
@@ -104,7 +187,7 @@ def get_coordinates(location):
             "format": "json",
             "limit": 1
         }
-        resp = requests.get(url, params=params, headers=HEADERS, timeout=5)
+        resp = await _CLIENT.get(url, params=params)
         resp.raise_for_status()
         data = resp.json()
         
@@ -113,11 +196,12 @@ def get_coordinates(location):
             
         lat = data[0]["lat"]
         lon = data[0]["lon"]
+        _COORDS_CACHE[key] = (lat, lon)
         return lat, lon
     except Exception:
         return None
 
-def get_time_by_coordinates(lat, lon):
+async def get_time_by_coordinates(lat, lon):
     """
     Call TimeAPI.io's /Time/current/coordinate endpoint to get time info.
     Returns (datetime_str, timezone_id) or (None, None) if error.
@@ -128,7 +212,7 @@ def get_time_by_coordinates(lat, lon):
             "latitude": lat,
             "longitude": lon
         }
-        resp = requests.get(url, params=params, timeout=5)
+        resp = await _CLIENT.get(url, params=params)
         resp.raise_for_status()
         data = resp.json()
         
@@ -142,14 +226,14 @@ def get_time_by_coordinates(lat, lon):
     except Exception:
         return None, None
 
-def get_time(location):
+async def get_time(location):
     """
     Gets the current time for the specified location.
     Uses TimeAPI.io approach from time.py.
     """
     try:
         # Step 1: Get coordinates for the location
-        coords = get_coordinates(location)
+        coords = await get_coordinates(location)
         
         if not coords:
             raise ValueError(f"Location '{location}' not found.")
@@ -157,69 +241,129 @@ def get_time(location):
         lat, lon = coords
             
         # Step 2: Get time data from TimeAPI.io
-        current_time, timezone_id = get_time_by_coordinates(lat, lon)
+        current_time, timezone_id = await get_time_by_coordinates(lat, lon)
         
         if not current_time or not timezone_id:
             raise ValueError("Could not get time data for the coordinates.")
         
-        # Format the time data
+        # Format the time data by slicing the fixed-width ISO string
+        # ("YYYY-MM-DDTHH:MM:SS..."), which is cheaper than strftime()
         dt = datetime.datetime.fromisoformat(current_time.replace('Z', '+00:00'))
+        iso = dt.isoformat()
         
         return {
             "location": location,
             "timezone": timezone_id,
-            "time": dt.strftime("%H:%M:%S"),
-            "date": dt.strftime("%Y-%m-%d")
+            "time": iso[11:19],
+            "date": iso[:10]
         }
     except ValueError as e:
         # If we can't get the time, return an informative error
-        now = datetime.datetime.utcnow()
+        now = datetime.datetime.now(datetime.UTC).isoformat()
         return {
             "location": location,
             "timezone": f"Error: {str(e)}",
-            "time": now.strftime("%H:%M:%S") + " (UTC)",
-            "date": now.strftime("%Y-%m-%d")
+            "time": now[11:19] + " (UTC)",
+            "date": now[:10]
         }
     except Exception:
         # Generic error fallback
-        now = datetime.datetime.utcnow()
+        now = datetime.datetime.now(datetime.UTC).isoformat()
         return {
             "location": location,
             "timezone": "Error: Could not determine time for this location",
-            "time": now.strftime("%H:%M:%S") + " (UTC)",
-            "date": now.strftime("%Y-%m-%d")
+            "time": now[11:19] + " (UTC)",
+            "date": now[:10]
         }
 
-def main():
+async def process_message(payload, previous, decode, write):
+    """
+    Handles one incoming MCP message, parsed with decode(), and writes its
+    reply with write().
+    The network calls overlap with those of other messages, but the reply is
+    only written after the previous message's reply so output keeps input order.
+    """
+    reply = None
+    try:
+        # Parse the incoming message
+        msg = decode(payload)
+        if msg.get("type") == "tool-call":
+            # Handle the tool call
+            output = await handle_call(msg["tool"], msg["input"])
+            # Return the result in MCP format
+            reply = {
+                "type": "tool-result",
+                "output": output
+            }
+    except Exception as e:
+        # Handle any errors in MCP format
+        reply = {
+            "type": "error",
+            "error": str(e)
+        }
+    if previous is not None:
+        await previous
+    if reply is not None:
+        write(reply)
+
+async def serve_stdio():
     """
     Main execution loop that:
     1. Outputs tool description
-    2. Processes incoming tool calls from stdin
-    3. Returns results in MCP format
-    4. Handles errors appropriately
+    2. Reads incoming tool calls from stdin without blocking the event loop
+    3. Handles each call in its own task so queued calls overlap their I/O
+    4. Returns results in MCP format, in the order the calls arrived
     """
     # 1) Output tool description as first action
-    describe_tools()
+    describe_tools(send)
 
     # 2) Enter main processing loop for incoming requests
-    for line in sys.stdin:
+    reader = io.BufferedReader(sys.stdin.buffer.raw, buffer_size=STDIN_BUFFER_SIZE)
+    previous = None
+    while True:
+        line = await asyncio.to_thread(reader.readline)
+        if not line:
+            break
+        # 3) Each task waits on the one before it only to write its reply
+        previous = asyncio.create_task(process_message(line, previous, orjson.loads, send))
+    if previous is not None:
+        await previous
+
+async def serve_socket(fd):
+    """
+    Same loop as serve_stdio(), but over a Unix domain socket inherited from
+    the parent process, with length-prefixed MCP_WIRE frames instead of JSON lines.
+    Returns when the other end closes the socket.
+    """
+    reader, writer = await asyncio.open_unix_connection(sock=socket.socket(fileno=fd))
+    write = lambda message: writer.write(frame(message))
+    describe_tools(write)
+
+    previous = None
+    while True:
         try:
-            # 3) Parse the incoming JSON message
-            msg = json.loads(line)
-            if msg.get("type") == "tool-call":
-                # 4) Handle the tool call
-                output = handle_call(msg["tool"], msg["input"])
-                # 5) Return the result in MCP format
-                print(json.dumps({
-                    "type": "tool-result",
-                    "output": output
-                }), flush=True)
-        except Exception as e:
-            # 6) Handle any errors in MCP format
-            print(json.dumps({
-                "type": "error",
-                "error": str(e)
-            }), flush=True)
+            header = await reader.readexactly(4)
+            payload = await reader.readexactly(int.from_bytes(header, "little"))
+        except asyncio.IncompleteReadError:
+            break
+        previous = asyncio.create_task(process_message(payload, previous, unframe, write))
+    if previous is not None:
+        await previous
+    writer.close()
+
+def main():
+    """
+    Runs the tool on an asyncio event loop, over stdin/stdout or, when started
+    with --socket-fd (as the MCP server's process pool does), a Unix socket.
+    """
+    parser = argparse.ArgumentParser(description="MCP time tool")
+    parser.add_argument("--socket-fd", type=int,
+                        help="serve MCP over this inherited Unix socket instead of stdin/stdout")
+    args = parser.parse_args()
+    if args.socket_fd is not None:
+        asyncio.run(serve_socket(args.socket_fd))
+    else:
+        asyncio.run(serve_stdio())
 
 if __name__ == "__main__":
     main()
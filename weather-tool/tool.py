@@ -20,7 +20,9 @@ Usage:
     
     # Typically this server is called by an MCP client rather than directly
     
-    # In this Docker demo, the bridge service calls this tool via subprocess
+    # In this Docker demo, the MCP server either imports this tool or runs it
+    # as a subprocess with --socket-fd, speaking length-prefixed MessagePack
+    # MCP frames over a Unix domain socket (MCP_WIRE=json for JSON frames)
 
 Architecture in MCP-Demo:
     Browser → Frontend Container → Bridge Container → MCP Tool (this file)
@@ -41,17 +43,61 @@ Note:
     service with proper API authentication and error handling.
 """
 
+import os
+import io
 import sys
-import json
-import requests
+import socket
+import argparse
+import threading
+import orjson
+import msgspec
+import httpx
+from cachetools import TTLCache
 from random import choice
 
-def describe_tools():
+# Encoding of socket frames: MessagePack by default, or JSON with MCP_WIRE=json
+# for debugging. The stdio transport always uses JSON lines.
+MCP_WIRE = os.environ.get("MCP_WIRE", "msgpack")
+
+# Incoming calls are read as raw bytes straight into orjson, skipping the
+# text layer's UTF-8 decoding and newline translation
+STDIN_BUFFER_SIZE = 65536
+
+# Shared HTTP client so repeated lookups reuse pooled keep-alive connections
+# (and their TLS sessions) instead of opening a new one per request
+_CLIENT = httpx.Client(
+    http2=True,
+    timeout=3.0,
+    limits=httpx.Limits(
+        max_connections=int(os.environ.get("MCP_CLIENT_MAX_CONNECTIONS", 20)),
+        max_keepalive_connections=int(os.environ.get("MCP_CLIENT_MAX_KEEPALIVE", 10)),
+        keepalive_expiry=float(os.environ.get("MCP_CLIENT_KEEPALIVE_EXPIRY", 30))
+    )
+)
+
+# Current conditions from wttr.in, as (description, temperature), kept for 5 minutes
+_FORECAST_CACHE = TTLCache(maxsize=10_000, ttl=300)
+# The MCP server may import this tool and call it from several threads
+_FORECAST_LOCK = threading.Lock()
+
+# The only parts of a wttr.in ?format=j1 response this tool reads. Decoding
+# into these structs skips the rest of the (several KB) payload while parsing.
+class _WeatherDesc(msgspec.Struct):
+    value: str = "unknown"
+
+class _CurrentCondition(msgspec.Struct):
+    temp_F: str = "??"
+    weatherDesc: list[_WeatherDesc] = []
+
+class _WttrResponse(msgspec.Struct):
+    current_condition: list[_CurrentCondition] = []
+
+def describe_tools(write):
     """
-    Advertises tool capabilities by outputting a tool description JSON.
+    Advertises tool capabilities by writing a tool description message.
     This is the first message sent by an MCP tool upon startup.
     """
-    print(json.dumps({
+    write({
         "type": "tool-description",
         "tools": [
             {
@@ -73,7 +119,52 @@ def describe_tools():
                 }
             }
         ]
-    }), flush=True)  # flush ensures immediate output
+    })
+
+def send(message):
+    """
+    Writes one MCP message to stdout as a single line of JSON.
+    Flushes right away so the client sees the message immediately.
+    """
+    sys.stdout.buffer.write(orjson.dumps(message) + b"\n")
+    sys.stdout.buffer.flush()
+
+def frame(message):
+    """
+    Encodes one MCP message for the socket transport: a 4-byte little-endian
+    length followed by the MCP_WIRE payload, so no newline scanning is needed.
+    """
+    data = orjson.dumps(message) if MCP_WIRE == "json" else msgspec.msgpack.encode(message)
+    return len(data).to_bytes(4, "little") + data
+
+def unframe(payload):
+    """
+    Decodes the payload of one socket frame back into an MCP message.
+    """
+    return orjson.loads(payload) if MCP_WIRE == "json" else msgspec.msgpack.decode(payload)
+
+def handle_message(payload, decode):
+    """
+    Parses one incoming MCP message with decode() and returns the reply to
+    send, if any.
+    """
+    try:
+        # Parse the incoming message
+        msg = decode(payload)
+        if msg.get("type") == "tool-call":
+            # Handle the tool call and return the result in MCP format
+            output = handle_call(msg["tool"], msg["input"])
+            return {
+                "type": "tool-result",
+                "output": output
+            }
+    except Exception as e:
+        # Handle any errors in MCP format
+        return {
+            "type": "error",
+            "error": str(e)
+        }
+    return None
 
 def handle_call(tool, input):
     """
@@ -88,16 +179,29 @@ def get_forecast(location):
     """
     Attempts to fetch real weather data for the given location.
     Falls back to mock data if the API request fails.
+    Real conditions are served from _FORECAST_CACHE for a few minutes.
     """
+    key = location.lower().strip()
+    with _FORECAST_LOCK:
+        cached = _FORECAST_CACHE.get(key)
+    if cached:
+        desc, temp = cached
+        return {
+            "location": location,
+            "forecast": f"{desc} and {temp}°F in {location}"
+        }
     try:
         # Try to get data from a free weather API that doesn't require authentication
         url = f"https://wttr.in/{location}?format=j1"
-        response = requests.get(url, timeout=3)
+        response = _CLIENT.get(url)
         
         if response.status_code == 200:
-            data = response.json()
-            temp = data.get("current_condition", [{}])[0].get("temp_F", "??")
-            desc = data.get("current_condition", [{}])[0].get("weatherDesc", [{}])[0].get("value", "unknown")
+            data = msgspec.json.decode(response.content, type=_WttrResponse)
+            current = (data.current_condition or [_CurrentCondition()])[0]
+            temp = current.temp_F
+            desc = (current.weatherDesc or [_WeatherDesc()])[0].value
+            with _FORECAST_LOCK:
+                _FORECAST_CACHE[key] = (desc, temp)
             return {
                 "location": location,
                 "forecast": f"{desc} and {temp}°F in {location}"
@@ -114,7 +218,7 @@ def get_forecast(location):
         "forecast": f"{conditions} and {temp}°F in {location}"
     }
 
-def main():
+def serve_stdio():
     """
     Main execution loop that:
     1. Outputs tool description
@@ -123,27 +227,46 @@ def main():
     4. Handles errors appropriately
     """
     # 1) Output tool description as first action
-    describe_tools()
+    describe_tools(send)
 
     # 2) Enter main processing loop for incoming requests
-    for line in sys.stdin:
-        try:
-            # 3) Parse the incoming JSON message
-            msg = json.loads(line)
-            if msg.get("type") == "tool-call":
-                # 4) Handle the tool call
-                output = handle_call(msg["tool"], msg["input"])
-                # 5) Return the result in MCP format
-                print(json.dumps({
-                    "type": "tool-result",
-                    "output": output
-                }), flush=True)
-        except Exception as e:
-            # 6) Handle any errors in MCP format
-            print(json.dumps({
-                "type": "error",
-                "error": str(e)
-            }), flush=True)
+    reader = io.BufferedReader(sys.stdin.buffer.raw, buffer_size=STDIN_BUFFER_SIZE)
+    for line in reader:
+        # 3) Handle the message, 4) errors come back as MCP error messages
+        reply = handle_message(line, orjson.loads)
+        if reply is not None:
+            send(reply)
+
+def serve_socket(fd):
+    """
+    Same loop as serve_stdio(), but over a Unix domain socket inherited from
+    the parent process, with length-prefixed MCP_WIRE frames instead of JSON lines.
+    Returns when the other end closes the socket.
+    """
+    with socket.socket(fileno=fd) as conn:
+        describe_tools(lambda message: conn.sendall(frame(message)))
+        while True:
+            header = conn.recv(4, socket.MSG_WAITALL)
+            if len(header) < 4:
+                break
+            payload = conn.recv(int.from_bytes(header, "little"), socket.MSG_WAITALL)
+            reply = handle_message(payload, unframe)
+            if reply is not None:
+                conn.sendall(frame(reply))
+
+def main():
+    """
+    Runs the tool over stdin/stdout, or over a Unix domain socket when
+    started with --socket-fd (as the MCP server's process pool does).
+    """
+    parser = argparse.ArgumentParser(description="MCP weather tool")
+    parser.add_argument("--socket-fd", type=int,
+                        help="serve MCP over this inherited Unix socket instead of stdin/stdout")
+    args = parser.parse_args()
+    if args.socket_fd is not None:
+        serve_socket(args.socket_fd)
+    else:
+        serve_stdio()
 
 if __name__ == "__main__":
     main()